@@ -2,7 +2,9 @@
 Setup for pytest.
 """
 
+import os
 from doctest import ELLIPSIS
+from pathlib import Path
 
 import pytest
 from beartype import beartype
@@ -14,6 +16,28 @@ from sybil.parsers.rest import (
 )
 
 
+@beartype
+def pytest_configure() -> None:
+    """
+    Create temporary files in memory where possible.
+
+    Most tests write small files and start a command which reads them, so
+    using a ``tmpfs`` mount avoids disk I/O.
+    """
+    # pytest creates a directory only accessible to the current user within
+    # this directory, so using a shared location is safe.
+    shared_memory = Path("/dev/shm")  # noqa: S108
+    temproot_variable = "PYTEST_DEBUG_TEMPROOT"
+    if (
+        temproot_variable not in os.environ
+        and shared_memory.is_dir()
+        and os.access(path=shared_memory, mode=os.W_OK)
+    ):
+        # This is where pytest creates ``tmp_path`` directories.
+        # Setting it does not override a user's ``--basetemp``.
+        os.environ[temproot_variable] = str(object=shared_memory)
+
+
 @beartype
 def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
     """
@@ -3,13 +3,15 @@ An evaluator for running shell commands on example files.
 """
 
 import contextlib
+import errno
 import os
 import platform
 import subprocess
 import sys
 import textwrap
+import threading
 import uuid
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from pathlib import Path
 
 from beartype import beartype
@@ -17,6 +19,77 @@ from sybil import Example
 from sybil.evaluators.python import pad
 
 
+@beartype
+def _read_chunk(fd: int) -> bytes:
+    """Read a chunk of output from a file descriptor.
+
+    Args:
+        fd: The file descriptor to read from.
+
+    Returns:
+        The bytes read, or an empty bytes object at end of file.
+    """
+    # This matches the default pipe capacity on Linux, so a full pipe can be
+    # drained in a single call.
+    chunk_size = 64 * 1024
+    try:
+        return os.read(fd, chunk_size)
+    except OSError as exc:  # pragma: no cover
+        # On Linux, reading from the master side of a pseudo-terminal raises
+        # ``EIO`` once the slave side is closed, rather than returning
+        # end of file.
+        if exc.errno != errno.EIO:
+            raise
+        return b""
+
+
+@beartype
+def _copy_output(
+    fd: int,
+    write: Callable[[bytes], int],
+    chunks: list[bytes],
+) -> None:
+    """Copy output from a file descriptor until end of file.
+
+    Args:
+        fd: The file descriptor to read from.
+        write: A function to write live output with.
+        chunks: A list to append each chunk read to.
+    """
+    while chunk := _read_chunk(fd=fd):
+        write(chunk)
+        chunks.append(chunk)
+
+
+@beartype
+def _copy_output_in_thread(
+    fd: int,
+    write: Callable[[bytes], int],
+    chunks: list[bytes],
+    exceptions: list[Exception],
+    kill: Callable[[], None],
+) -> None:
+    """Copy output from a file descriptor until end of file, recording any
+    error so that it can be raised in the calling thread.
+
+    Args:
+        fd: The file descriptor to read from.
+        write: A function to write live output with.
+        chunks: A list to append each chunk read to.
+        exceptions: A list to append any exception raised to.
+        kill: A function to stop the command with if an error is raised.
+    """
+    try:
+        _copy_output(fd=fd, write=write, chunks=chunks)
+    except Exception as exc:  # noqa: BLE001
+        exceptions.append(exc)
+        kill()
+        # Keep draining the stream until end of file, discarding the output,
+        # so that anything still writing to it cannot block on a full pipe.
+        while _read_chunk(fd=fd):
+            pass
+
+
 def _run_with_color_and_capture_separate(
     *,
     command: list[str | Path],
@@ -72,22 +145,45 @@ def _run_with_color_and_capture_separate(
             else process.stderr.fileno()
         )
 
-        while any(
-            [
-                process.poll() is None,
-                stdout_chunk_bytes := b"",
-                stderr_chunk_bytes := b"",
-            ],
-        ):
-            chunk_size = 1024
-
-            stdout_chunk_bytes = os.read(stdout_master_fd, chunk_size)
-            stderr_chunk_bytes = os.read(stderr_master_fd, chunk_size)
-
-            sys.stdout.buffer.write(stdout_chunk_bytes)
-            stdout_output_chunks.append(stdout_chunk_bytes)
-            sys.stderr.buffer.write(stderr_chunk_bytes)
-            stderr_output_chunks.append(stderr_chunk_bytes)
+        # Read each stream until it is exhausted, rather than stopping when
+        # the process exits, so that output which is still buffered in the
+        # pipe is not lost.
+        #
+        # stderr is read in a separate thread so that a command which fills
+        # one pipe while we are blocked reading the other does not deadlock.
+        stderr_exceptions: list[Exception] = []
+        stderr_thread = threading.Thread(
+            target=_copy_output_in_thread,
+            kwargs={
+                "fd": stderr_master_fd,
+                "write": sys.stderr.buffer.write,
+                "chunks": stderr_output_chunks,
+                "exceptions": stderr_exceptions,
+                "kill": process.kill,
+            },
+            # The thread is joined below, but that wait can itself be
+            # interrupted, for example by a second Ctrl-C. In that case, do
+            # not keep the interpreter alive waiting for the command's output.
+            daemon=True,
+        )
+        stderr_thread.start()
+        try:
+            _copy_output(
+                fd=stdout_master_fd,
+                write=sys.stdout.buffer.write,
+                chunks=stdout_output_chunks,
+            )
+        except BaseException:
+            # Stop the command so that the stderr thread reaches the end of
+            # its stream, rather than reading from a file descriptor which is
+            # closed when we leave the ``Popen`` context.
+            process.kill()
+            raise
+        finally:
+            stderr_thread.join()
+
+        if stderr_exceptions:
+            raise stderr_exceptions[0]
 
     if use_pty:  # pragma: no cover
         os.close(fd=stdout_master_fd)
@@ -41,10 +41,12 @@ def _failing_evaluator(example: Example) -> None:
     )
 
 
-@pytest.fixture(name="rst_file")
-def fixture_rst_file(tmp_path: Path) -> Path:
+@pytest.fixture(name="rst_file", scope="module")
+def fixture_rst_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
     """
     Fixture to create a temporary RST file with Python code blocks.
+
+    No test modifies this file, so it is created once for the module.
     """
     content = """
     .. code-block:: python
@@ -52,7 +54,9 @@ def fixture_rst_file(tmp_path: Path) -> Path:
         x = 2 + 2
         assert x == 4
     """
-    test_document = tmp_path / "test_document.rst"
+    test_document = (
+        tmp_path_factory.mktemp(basename="multi") / "test_document.rst"
+    )
     test_document.write_text(data=content, encoding="utf-8")
     return test_document
 
@@ -17,30 +17,51 @@ from sybil.parsers.rest.codeblock import CodeBlockParser
 
 from sybil_extras.evaluators.shell_evaluator import ShellCommandEvaluator
 
+# Relied upon features:
+#
+# * Includes exactly one code block
+# * Contents of the code block match those in tests
+# * The code block is the last element in the file
+# * There is text outside the code block
+_RST_CONTENT = textwrap.dedent(
+    text="""\
+    Not in code block
 
-@pytest.fixture(name="rst_file")
-def fixture_rst_file(tmp_path: Path) -> Path:
+    .. code-block:: python
+
+       x = 2 + 2
+       assert x == 4
     """
-    Fixture to create a temporary RST file with code blocks.
+)
+
+
+class _UnwritableStream:
+    """
+    A stand-in for ``sys.stdout`` or ``sys.stderr`` which cannot be written
+    to.
     """
-    # Relied upon features:
-    #
-    # * Includes exactly one code block
-    # * Contents of the code block match those in tests
-    # * The code block is the last element in the file
-    # * There is text outside the code block
-    content = textwrap.dedent(
-        text="""\
-        Not in code block
 
-        .. code-block:: python
+    @property
+    def buffer(self) -> "_UnwritableStream":
+        """
+        The binary buffer of the stream.
+        """
+        return self
 
-           x = 2 + 2
-           assert x == 4
+    def write(self, data: bytes) -> int:
         """
-    )
+        Fail to write to the stream.
+        """
+        raise BrokenPipeError(len(data))
+
+
+@pytest.fixture(name="rst_file")
+def fixture_rst_file(tmp_path: Path) -> Path:
+    """
+    Fixture to create a temporary RST file with code blocks.
+    """
     test_document = tmp_path / "test_document.example.rst"
-    test_document.write_text(data=content, encoding="utf-8")
+    test_document.write_text(data=_RST_CONTENT, encoding="utf-8")
     return test_document
 
 
@@ -48,7 +69,7 @@ def test_error(rst_file: Path) -> None:
     """
     A ``subprocess.CalledProcessError`` is raised if the command fails.
     """
-    args = ["sh", "-c", "exit 1"]
+    args = ["false"]
     evaluator = ShellCommandEvaluator(
         args=args,
         pad_file=False,
@@ -99,6 +120,40 @@ def test_output_shown(
     assert outerr.err == "Hello Stderr!\n"
 
 
+@pytest.mark.skipif(
+    condition=sys.platform == "win32",
+    reason="Pseudo-terminals are not supported on Windows.",
+)
+def test_output_shown_with_pty(  # pragma: no cover
+    rst_file: Path,
+    capsysbinary: pytest.CaptureFixture[bytes],
+) -> None:
+    """
+    Output is shown when using a pseudo-terminal, and no error is raised
+    when the command closes the terminal.
+    """
+    evaluator = ShellCommandEvaluator(
+        args=[
+            "sh",
+            "-c",
+            "echo 'Hello, Sybil!' && echo >&2 'Hello Stderr!'",
+        ],
+        pad_file=False,
+        write_to_file=False,
+        use_pty=True,
+    )
+    parser = CodeBlockParser(language="python", evaluator=evaluator)
+    sybil = Sybil(parsers=[parser])
+
+    document = sybil.parse(path=rst_file)
+    (example,) = document.examples()
+    example.evaluate()
+    outerr = capsysbinary.readouterr()
+    # The pseudo-terminal translates newlines to CRLF.
+    assert outerr.out == b"Hello, Sybil!\r\n"
+    assert outerr.err == b"Hello Stderr!\r\n"
+
+
 def test_rm(
     rst_file: Path,
     capsys: pytest.CaptureFixture[str],
@@ -155,12 +210,13 @@ def test_pass_env(
 def test_global_env(
     rst_file: Path,
     tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     """
     Global environment variables are sent to the command by default.
     """
     env_key = "ENV_KEY"
-    os.environ[env_key] = "ENV_VALUE"
+    monkeypatch.setenv(name=env_key, value="ENV_VALUE")
     new_file = tmp_path / "new_file.txt"
     evaluator = ShellCommandEvaluator(
         args=[
@@ -178,7 +234,6 @@ def test_global_env(
     document = sybil.parse(path=rst_file)
     (example,) = document.examples()
     example.evaluate()
-    del os.environ[env_key]
     new_file_content = new_file.read_text(encoding="utf-8")
     assert new_file_content == "Hello, ENV_VALUE!\n"
 
@@ -229,17 +284,19 @@ def test_file_path(rst_file: Path, capsys: pytest.CaptureFixture[str]) -> None:
 
     document = sybil.parse(path=rst_file)
     (example,) = document.examples()
-    example.evaluate()
-    output = capsys.readouterr().out
-    given_file_path = Path(output.strip())
-    assert given_file_path.parent == rst_file.parent
-    assert given_file_path.is_absolute()
-    assert not given_file_path.exists()
-    assert given_file_path.name.startswith("test_document_example_rst_")
-    example.evaluate()
-    output = capsys.readouterr().out
-    new_given_file_path = Path(output.strip())
-    assert new_given_file_path != given_file_path
+    number_of_evaluations = 2
+    given_file_paths: set[Path] = set()
+    for _ in range(number_of_evaluations):
+        example.evaluate()
+        output = capsys.readouterr().out
+        given_file_path = Path(output.strip())
+        assert given_file_path.parent == rst_file.parent
+        assert given_file_path.is_absolute()
+        assert not given_file_path.exists()
+        assert given_file_path.name.startswith("test_document_example_rst_")
+        given_file_paths.add(given_file_path)
+
+    assert len(given_file_paths) == number_of_evaluations
 
 
 def test_file_suffix(
@@ -319,16 +376,9 @@ def test_pad(rst_file: Path, tmp_path: Path) -> None:
     (example,) = document.examples()
     example.evaluate()
     given_file_content = file_path.read_text(encoding="utf-8")
-    expected_content = textwrap.dedent(
-        text="""\
-
-
-
-
-        x = 2 + 2
-        assert x == 4
-        """,
-    )
+    # The code block starts on line 5 of the document, so four newlines are
+    # added before it.
+    expected_content = "\n\n\n\nx = 2 + 2\nassert x == 4\n"
     assert given_file_content == expected_content
 
 
@@ -402,7 +452,13 @@ def test_no_changes_mtime(rst_file: Path) -> None:
     """
     The modification time of the file is not changed if no changes are made.
     """
-    original_mtime = rst_file.stat().st_mtime
+    # Set a modification time in the past so that any write to the file
+    # would change it, however coarse the filesystem's timestamps are.
+    past_time_ns = 1_000_000_000
+    os.utime(path=rst_file, ns=(past_time_ns, past_time_ns))
+    # The filesystem may round or clamp the time we set, so we compare against
+    # the time it actually stored.
+    original_mtime_ns = rst_file.stat().st_mtime_ns
     evaluator = ShellCommandEvaluator(
         args=["true"],
         pad_file=True,
@@ -415,8 +471,7 @@ def test_no_changes_mtime(rst_file: Path) -> None:
     document = sybil.parse(path=rst_file)
     (example,) = document.examples()
     example.evaluate()
-    new_mtime = rst_file.stat().st_mtime
-    assert new_mtime == original_mtime
+    assert rst_file.stat().st_mtime_ns == original_mtime_ns
 
 
 def test_non_utf8_output(
@@ -449,7 +504,109 @@ def test_non_utf8_output(
     assert output == b"\xc0\x80\n"
 
 
-def test_no_file_left_behind_on_interruption(
+def test_large_output(
+    rst_file: Path,
+    capsysbinary: pytest.CaptureFixture[bytes],
+) -> None:
+    """
+    Output larger than a pipe buffer on one stream does not block the command.
+    """
+    output_size = 1024 * 1024
+    evaluator = ShellCommandEvaluator(
+        args=["sh", "-c", f"head -c {output_size} /dev/zero"],
+        pad_file=False,
+        write_to_file=False,
+        use_pty=False,
+    )
+    parser = CodeBlockParser(language="python", evaluator=evaluator)
+    sybil = Sybil(parsers=[parser])
+
+    document = sybil.parse(path=rst_file)
+    (example,) = document.examples()
+    example.evaluate()
+    output = capsysbinary.readouterr().out
+    assert output == b"\0" * output_size
+
+
+@pytest.mark.filterwarnings(
+    "error::pytest.PytestUnhandledThreadExceptionWarning"
+)
+def test_stdout_write_error(
+    rst_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    An error writing the command's stdout is raised, and the command is
+    stopped rather than left running.
+    """
+    # Use a single process which holds stdout open, rather than a shell,
+    # because some shells start a child process for ``exec`` which would be
+    # left running and holding the pipe after the shell is killed.
+    command = textwrap.dedent(
+        text="""\
+        import time
+
+        print("Hello, Sybil!", flush=True)
+        time.sleep(10)
+        """,
+    )
+    evaluator = ShellCommandEvaluator(
+        args=[sys.executable, "-c", command],
+        pad_file=False,
+        write_to_file=False,
+        use_pty=False,
+    )
+    parser = CodeBlockParser(language="python", evaluator=evaluator)
+    sybil = Sybil(parsers=[parser])
+
+    document = sybil.parse(path=rst_file)
+    (example,) = document.examples()
+    monkeypatch.setattr(target=sys, name="stdout", value=_UnwritableStream())
+    start_time = time.monotonic()
+    with pytest.raises(expected_exception=BrokenPipeError):
+        example.evaluate()
+    # The command is killed rather than waited for.
+    max_seconds = 5
+    assert time.monotonic() - start_time < max_seconds
+
+
+def test_stderr_write_error(
+    rst_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    An error writing the command's stderr is raised, even if the command
+    goes on to write more than a pipe buffer to stderr.
+    """
+    output_size = 1024 * 1024
+    evaluator = ShellCommandEvaluator(
+        args=[
+            "sh",
+            "-c",
+            f"echo >&2 'Hello Stderr!'; head -c {output_size} /dev/zero >&2",
+        ],
+        pad_file=False,
+        write_to_file=False,
+        use_pty=False,
+    )
+    parser = CodeBlockParser(language="python", evaluator=evaluator)
+    sybil = Sybil(parsers=[parser])
+
+    document = sybil.parse(path=rst_file)
+    (example,) = document.examples()
+    monkeypatch.setattr(target=sys, name="stderr", value=_UnwritableStream())
+    with pytest.raises(expected_exception=BrokenPipeError):
+        example.evaluate()
+
+
+@pytest.mark.skipif(
+    condition=sys.platform == "win32",
+    reason=(
+        "On Windows, sending SIGINT terminates the process without running "
+        "cleanup code."
+    ),
+)
+def test_no_file_left_behind_on_interruption(  # pragma: no cover
     rst_file: Path,
     tmp_path: Path,
 ) -> None:
@@ -460,6 +617,7 @@ def test_no_file_left_behind_on_interruption(
         text="""\
         import time
 
+        print("Ready", flush=True)
         time.sleep(2)
         """,
     )
@@ -504,12 +662,17 @@ def test_no_file_left_behind_on_interruption(
         encoding="utf-8",
     )
 
-    # Sanity check the script by checking that it can run fine.
-    run_script_args = [sys.executable, str(object=evaluator_script)]
-    subprocess.run(args=run_script_args, check=True)
-
-    with subprocess.Popen(args=run_script_args) as evaluator_process:
-        time.sleep(0.1)
+    # Use unbuffered output so that the evaluator passes on the sleep
+    # script's output as soon as it is written.
+    run_script_args = [sys.executable, "-u", str(object=evaluator_script)]
+    with subprocess.Popen(
+        args=run_script_args,
+        stdout=subprocess.PIPE,
+    ) as evaluator_process:
+        # Wait until the command is running, and so the temporary file
+        # exists, before interrupting the evaluator.
+        assert evaluator_process.stdout is not None
+        assert evaluator_process.stdout.readline().strip() == b"Ready"
         os.kill(evaluator_process.pid, signal.SIGINT)
         evaluator_process.wait()
 
@@ -529,8 +692,11 @@ def test_newline_system(
     """
     The system line endings are used by default.
     """
-    rst_file_contents = rst_file.read_text(encoding="utf-8")
-    rst_file.write_text(data=rst_file_contents, newline=source_newline)
+    rst_file.write_text(
+        data=_RST_CONTENT,
+        encoding="utf-8",
+        newline=source_newline,
+    )
     sh_function = """
     cp "$2" "$1"
     """
@@ -573,8 +739,11 @@ def test_newline_given(
     """
     The given line ending option is used.
     """
-    rst_file_contents = rst_file.read_text(encoding="utf-8")
-    rst_file.write_text(data=rst_file_contents, newline=source_newline)
+    rst_file.write_text(
+        data=_RST_CONTENT,
+        encoding="utf-8",
+        newline=source_newline,
+    )
     sh_function = """
     cp "$2" "$1"
     """